@@ -187,22 +187,20 @@ if lawyers_df is not None and not lawyers_df.empty:
     # Suppress firm-only rows whose firm is covered by a named-lawyer row.
     # E.g. if we have "Michael Penney / Arnold & Porter Kaye Scholer LLP" already,
     # drop "(firm only) / Arnold & Porter LLP" because the firm name is a substring.
-    named_firms = set(
-        str(row.get("Law Firm", "") or "").strip()
-        for _, row in lawyers_df.iterrows()
-        if str(row.get("Lawyer", "") or "").strip()
-        and str(row.get("Lawyer", "") or "").strip() != "(Firm only - no lawyer name listed)"
-    )
-
-    def _is_redundant_firm_only(row):
-        lawyer = str(row.get("Lawyer", "") or "").strip()
-        is_fo = not lawyer or lawyer == "(Firm only - no lawyer name listed)"
-        if not is_fo:
-            return False
-        firm = str(row.get("Law Firm", "") or "").strip()
-        return any(firm in nf or nf in firm for nf in named_firms)
-
-    lawyers_df = lawyers_df[~lawyers_df.apply(_is_redundant_firm_only, axis=1)]
+    # Read the two columns once as plain lists instead of building a Series per row.
+    lawyer_names = [str(l or "").strip() for l in lawyers_df["Lawyer"].tolist()]
+    firm_names = [str(f or "").strip() for f in lawyers_df["Law Firm"].tolist()]
+    firm_only_flags = [
+        not lawyer or lawyer == "(Firm only - no lawyer name listed)" for lawyer in lawyer_names
+    ]
+
+    named_firms = {firm for firm, is_fo in zip(firm_names, firm_only_flags) if not is_fo}
+
+    keep_rows = [
+        not (is_fo and any(firm in nf or nf in firm for nf in named_firms))
+        for firm, is_fo in zip(firm_names, firm_only_flags)
+    ]
+    lawyers_df = lawyers_df[keep_rows]
 
     for i, row in lawyers_df.iterrows():
         lawyer = str(row.get("Lawyer", "") or "").strip()
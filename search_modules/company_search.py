@@ -1,10 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import re
 import json
+import time
+import threading
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
 from .filing_types import HIGH_PRIORITY_LEGAL_FILINGS
@@ -14,6 +19,48 @@ from .law_firm_reference import find_firms_by_reference
 LAW_FIRM_SUFFIXES = ('LLP', 'LLC', 'PLLC', 'P.C.', 'P.A.')
 LAW_FIRM_SUFFIX_PATTERN = r'(?:LLP|LLC|PLLC|P\.C\.|P\.A\.)'
 
+# Shared SEC session for the per-company filing fan-out: pooled keep-alive
+# connections avoid a TCP/TLS handshake per document, and 429/5xx responses
+# are retried with backoff instead of silently dropping the filing.
+_SEC_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({'GET'}),
+    raise_on_status=False,
+)
+_SEC_SESSION = requests.Session()
+_SEC_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=_SEC_RETRY))
+
+# Process-wide SEC throttle. Filing fetches run in nested thread pools
+# (companies x filings), so limits must be global: request starts are spaced at
+# least 0.1s apart to stay under SEC's 10 requests/second fair-access limit, and
+# the semaphore bounds how many requests are in flight at once.
+_SEC_MIN_REQUEST_INTERVAL = 0.1
+_SEC_RATE_LOCK = threading.Lock()
+_sec_next_request_at = 0.0
+_SEC_REQUEST_SLOTS = threading.BoundedSemaphore(10)
+
+
+def _sec_get(url, **kwargs):
+    global _sec_next_request_at
+    with _SEC_REQUEST_SLOTS:
+        # Reserve the next start slot under the lock, then sleep outside it
+        with _SEC_RATE_LOCK:
+            now = time.monotonic()
+            start_at = max(now, _sec_next_request_at)
+            _sec_next_request_at = start_at + _SEC_MIN_REQUEST_INTERVAL
+        if start_at > now:
+            time.sleep(start_at - now)
+        return _SEC_SESSION.get(url, **kwargs)
+
+# Compiled once: firm-name cleanup runs for every firm in every filing
+_OPINION_PREFIX_RE = re.compile(r'^\s*(?:opinion\s+of|opinion)\s+', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+_TRAILING_PUNCT_RE = re.compile(r'[.;:]+$')
+_REPEATED_SUFFIX_RE = re.compile(rf'\b({LAW_FIRM_SUFFIX_PATTERN})\b(?:[\s\.,]*(\1))+\b', re.IGNORECASE)
+_AND_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+
 
 @st.cache_data(ttl=3600, show_spinner=False)
 def load_all_companies():
@@ -158,10 +205,10 @@ def deduplicate_firm_lawyers(firm_to_lawyers):
 
 def clean_firm_name(firm):
     firm = firm.strip()
-    firm = re.sub(r'^\s*(?:opinion\s+of|opinion)\s+', '', firm, flags=re.IGNORECASE)
-    firm = re.sub(r'\s+', ' ', firm)
-    firm = re.sub(r'[.;:]+$', '', firm)
-    firm = re.sub(rf'\b({LAW_FIRM_SUFFIX_PATTERN})\b(?:[\s\.,]*(\1))+\b', r'\1', firm, flags=re.IGNORECASE)
+    firm = _OPINION_PREFIX_RE.sub('', firm)
+    firm = _WHITESPACE_RE.sub(' ', firm)
+    firm = _TRAILING_PUNCT_RE.sub('', firm)
+    firm = _REPEATED_SUFFIX_RE.sub(r'\1', firm)
     return firm.strip()
 
 
@@ -194,10 +241,12 @@ def is_valid_firm_name(firm_name, company_name=None):
     return True
 
 
+@lru_cache(maxsize=4096)
 def normalize_firm_name(firm):
+    # Memoized: the same firm strings repeat across filings and companies
     firm = clean_firm_name(firm)
-    firm = re.sub(r'\s+and\s+', ' & ', firm, flags=re.IGNORECASE)
-    firm = re.sub(r'\s+', ' ', firm)
+    firm = _AND_RE.sub(' & ', firm)
+    firm = _WHITESPACE_RE.sub(' ', firm)
     if not any(firm.endswith(suffix) for suffix in LAW_FIRM_SUFFIXES):
         firm = firm + " LLP"
     return firm
@@ -676,42 +725,58 @@ def get_cik_from_ticker(ticker):
     return None, None
 
 
-def get_company_filings(cik, start_date, end_date):
-    url = f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json"
+@st.cache_data(ttl=900, show_spinner=False)
+def _fetch_company_filings(cik, start_date_str, end_date_str):
+    """Fetch and filter a company's SEC submissions (cached for 15 minutes; errors propagate so they aren't cached)"""
+    url = f"https://data.sec.gov/submissions/CIK{cik}.json"
     headers = {"User-Agent": "Company contact@email.com"}
 
-    try:
-        response = requests.get(url, headers=headers)
-        data = response.json()
-        filings = []
-        recent = data.get('filings', {}).get('recent', {})
+    response = _sec_get(url, headers=headers, timeout=20)
+    response.raise_for_status()
+    data = response.json()
+    filings = []
+    recent = data.get('filings', {}).get('recent', {})
 
-        # Convert dates to strings for comparison
-        if hasattr(start_date, 'strftime'):
-            start_date_str = start_date.strftime('%Y-%m-%d')
-        else:
-            start_date_str = str(start_date)
+    for i in range(len(recent.get('form', []))):
+        filing_type = recent['form'][i]
+        filing_date = recent['filingDate'][i]
 
-        if hasattr(end_date, 'strftime'):
-            end_date_str = end_date.strftime('%Y-%m-%d')
-        else:
-            end_date_str = str(end_date)
-
-        for i in range(len(recent.get('form', []))):
-            filing_type = recent['form'][i]
-            filing_date = recent['filingDate'][i]
-
-            if filing_type in HIGH_PRIORITY_LEGAL_FILINGS and start_date_str <= filing_date <= end_date_str:
-                filings.append({
-                    'type': filing_type,
-                    'date': filing_date,
-                    'accession': recent['accessionNumber'][i],
-                    'primary_doc': recent.get('primaryDocument', [None])[i] if i < len(recent.get('primaryDocument', [])) else None
-                })
+        if filing_type in HIGH_PRIORITY_LEGAL_FILINGS and start_date_str <= filing_date <= end_date_str:
+            filings.append({
+                'type': filing_type,
+                'date': filing_date,
+                'accession': recent['accessionNumber'][i],
+                'primary_doc': recent.get('primaryDocument', [None])[i] if i < len(recent.get('primaryDocument', [])) else None
+            })
+
+    filings.sort(key=lambda x: x['date'], reverse=True)
+    return filings
 
-        filings.sort(key=lambda x: x['date'], reverse=True)
-        return filings
+
+def get_company_filings(cik, start_date, end_date, raise_errors=False):
+    """
+    Return a company's legal-counsel filings in the date range, newest first
+
+    Fetch/parse failures return [] unless raise_errors is True, in which case they
+    propagate so callers can tell "no filings" apart from a failed lookup.
+    """
+    # Convert dates to strings for comparison (and a hashable cache key)
+    if hasattr(start_date, 'strftime'):
+        start_date_str = start_date.strftime('%Y-%m-%d')
+    else:
+        start_date_str = str(start_date)
+
+    if hasattr(end_date, 'strftime'):
+        end_date_str = end_date.strftime('%Y-%m-%d')
+    else:
+        end_date_str = str(end_date)
+
+    # st.cache_data hands out a fresh copy per call, so callers can't mutate the cache
+    try:
+        return _fetch_company_filings(str(cik).zfill(10), start_date_str, end_date_str)
     except Exception:
+        if raise_errors:
+            raise
         return []
 
 
@@ -719,7 +784,7 @@ def extract_counsel_sections(doc_url):
     headers = {"User-Agent": "Company contact@email.com"}
 
     try:
-        response = requests.get(doc_url, headers=headers, timeout=20)
+        response = _sec_get(doc_url, headers=headers, timeout=20)
         if response.status_code != 200:
             return None
 
@@ -799,7 +864,8 @@ Return JSON format:
                     error_detail = response.json().get('error', {}).get('message', '')
                     if error_detail:
                         error_msg += f": {error_detail}"
-                except:
+                except ValueError:
+                    # Error body wasn't JSON
                     pass
                 raise Exception(error_msg)
 
@@ -860,7 +926,7 @@ def process_single_filing(filing, cik, company_name, api_key):
 
     if not extracted_text:
         # Document failed to extract or was too short
-        raise Exception(f"No text extracted from {filing['type']} ({filing['date']})")
+        raise ValueError(f"No text extracted from {filing['type']} ({filing['date']})")
 
     # Try regex extraction
     regex_results = extract_lawyers_by_regex(extracted_text, company_name)
@@ -889,7 +955,7 @@ def process_single_filing(filing, cik, company_name, api_key):
 
     if not firm_to_lawyers:
         # Successfully extracted text but found no lawyers or firms
-        raise Exception(f"No lawyers found in {filing['type']} ({filing['date']})")
+        raise ValueError(f"No lawyers found in {filing['type']} ({filing['date']})")
 
     return firm_to_lawyers
 
@@ -949,8 +1015,8 @@ def search_company_for_lawyers(company_identifier, start_date, end_date, api_key
     no_text_count = 0
     no_lawyers_count = 0
 
-    # Process filings in parallel (5 at a time to respect rate limits)
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    # Process filings in parallel (SEC requests are rate-limited globally by _sec_get)
+    with ThreadPoolExecutor(max_workers=10) as executor:
         future_to_filing = {
             executor.submit(process_single_filing, filing, cik, company_name, api_key): filing
             for filing in filings
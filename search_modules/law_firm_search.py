@@ -1,11 +1,110 @@
-import pandas as pd
+import re
+import time
+import logging
+import threading
+import requests
+from collections import defaultdict, deque, OrderedDict
+from itertools import islice
+from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from .utils import search_paginated, extract_ticker_and_clean_name, filter_important_filings
+from .utils import search_entity_for_companies
+
+logger = logging.getLogger(__name__)
+
+# Failures expected from SEC fetches and filing parsing; anything else is a bug
+_LOOKUP_ERRORS = (requests.RequestException, ValueError, KeyError, AttributeError)
+
+# Filings checked concurrently per company in find_lawyer_for_company_from_firm
+_FILING_WINDOW = 3
+
+_FIRM_SUFFIX_RE = re.compile(r'\s+(llp|llc|pllc|p\.c\.|p\.a\.)\s*$', re.IGNORECASE)
+
+# Process-wide LRU memo of (cik, firm, start, end) -> (lawyer, stored_at). Each
+# miss costs a submissions fetch plus a download and parse of relevant filings.
+_LAWYER_CACHE = OrderedDict()
+_LAWYER_CACHE_LOCK = threading.Lock()
+_LAWYER_CACHE_MAX_SIZE = 4096
+_LAWYER_CACHE_TTL = 900
+
+
+def _get_cached_lawyer(cache_key):
+    """Return the cached lawyer for cache_key, or None if missing / expired"""
+    with _LAWYER_CACHE_LOCK:
+        entry = _LAWYER_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        lawyer_name, stored_at = entry
+        if time.monotonic() - stored_at > _LAWYER_CACHE_TTL:
+            del _LAWYER_CACHE[cache_key]
+            return None
+        _LAWYER_CACHE.move_to_end(cache_key)
+        return lawyer_name
+
+
+def _set_cached_lawyer(cache_key, lawyer_name):
+    with _LAWYER_CACHE_LOCK:
+        _LAWYER_CACHE[cache_key] = (lawyer_name, time.monotonic())
+        _LAWYER_CACHE.move_to_end(cache_key)
+        while len(_LAWYER_CACHE) > _LAWYER_CACHE_MAX_SIZE:
+            _LAWYER_CACHE.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _normalized_firm(firm):
+    """normalize_firm_name(firm), lower-cased (suffix kept)"""
+    from .company_search import normalize_firm_name
+    return normalize_firm_name(firm).lower()
+
+
+@lru_cache(maxsize=4096)
+def _firm_match_key(firm):
+    """Normalized, lower-cased firm name with the entity suffix (LLP, P.C., ...) stripped"""
+    return _FIRM_SUFFIX_RE.sub('', _normalized_firm(firm)).strip()
+
+
+def _find_firm_match(firm_to_lawyers, target_firm_name):
+    """
+    Return a lawyer from the firm in firm_to_lawyers matching target_firm_name, or None
+
+    Args:
+        firm_to_lawyers: Dict of firm name -> set of lawyer names (one filing's results)
+        target_firm_name: Law firm being searched for
+    """
+    # Index firms by suffix-stripped key so an exact match ("Cooley" vs
+    # "Cooley LLP") is a single dict lookup
+    lawyers_by_firm_key = defaultdict(set)
+    lawyers_by_normalized_firm = defaultdict(set)
+    for firm, lawyers in firm_to_lawyers.items():
+        named_lawyers = {l for l in lawyers if l and l != '(Firm only - no lawyer name listed)'}
+        firm_key = _firm_match_key(firm)
+        if firm_key:
+            lawyers_by_firm_key[firm_key].update(named_lawyers)
+            lawyers_by_normalized_firm[_normalized_firm(firm)].update(named_lawyers)
+
+    firm_lawyers = lawyers_by_firm_key.get(_firm_match_key(target_firm_name))
+
+    if not firm_lawyers:
+        # Fuzzy fallback on the full normalized names, suffix included, so a short
+        # firm like "Davis LLP" doesn't match inside "Davis Polk & Wardwell LLP"
+        target_normalized = _normalized_firm(target_firm_name)
+        firm_lawyers = set()
+        for normalized_firm, lawyers in lawyers_by_normalized_firm.items():
+            if target_normalized in normalized_firm or normalized_firm in target_normalized:
+                firm_lawyers.update(lawyers)
+
+    if firm_lawyers:
+        # Sort for a deterministic pick among the filing's lawyers
+        return sorted(firm_lawyers)[0]
+    return None
 
 
 def find_lawyer_for_company_from_firm(company_info, firm_name, api_key, start_date, end_date):
     """
-    Find which lawyer from a specific firm represented a company
+    Find which lawyer from a specific firm most recently represented a company
+
+    Filings are checked newest-first through a small sliding window of concurrent
+    fetches, and the search stops at the first filing that names a lawyer from
+    the firm; older filings not yet submitted are never fetched.
 
     Args:
         company_info: Dict with 'ticker', 'cik', 'company_name'
@@ -18,7 +117,7 @@ def find_lawyer_for_company_from_firm(company_info, firm_name, api_key, start_da
         Lawyer name or "None found"
     """
     try:
-        from .company_search import search_company_for_lawyers, normalize_firm_name
+        from .company_search import get_company_filings, process_single_filing
 
         ticker = company_info.get('ticker')
         cik = company_info.get('cik')
@@ -27,42 +126,72 @@ def find_lawyer_for_company_from_firm(company_info, firm_name, api_key, start_da
         if not ticker or not cik:
             return "None found"
 
-        # Search for all lawyers for this company
-        lawyers_df = search_company_for_lawyers(
-            company_identifier=ticker,
-            start_date=start_date,
-            end_date=end_date,
-            api_key=api_key,
-            progress_callback=None,
-            cik=cik,
-            company_name=company_name
-        )
-
-        if lawyers_df.empty:
-            return "None found"
-
-        # Normalize firm names for comparison
-        normalized_target_firm = normalize_firm_name(firm_name).lower()
-
-        # Filter to only lawyers from the specified firm
-        firm_lawyers = []
-        for _, row in lawyers_df.iterrows():
-            row_firm = normalize_firm_name(row['Law Firm']).lower()
-
-            # Fuzzy match - check if target firm is in row firm or vice versa
-            if normalized_target_firm in row_firm or row_firm in normalized_target_firm:
-                lawyer = row['Lawyer']
-                if lawyer and lawyer != '(Firm only - no lawyer name listed)':
-                    firm_lawyers.append(lawyer)
-
-        if firm_lawyers:
-            # Return first lawyer found (most recent from the search)
-            return firm_lawyers[0]
-        else:
-            return "None found"
-
-    except Exception as e:
+        cache_key = (str(cik), firm_name.lower().strip(), str(start_date), str(end_date))
+        cached_lawyer = _get_cached_lawyer(cache_key)
+        if cached_lawyer is not None:
+            return cached_lawyer
+
+        # Already sorted newest-first. A failed submissions fetch raises (and so
+        # is never cached) instead of looking like "no filings".
+        filings = get_company_filings(cik, start_date, end_date, raise_errors=True)
+
+        lawyer_name = "None found"
+        # Set when a filing couldn't be checked (e.g. SEC throttling, a timeout or an
+        # unexpected error); the answer may then be incomplete, so it isn't cached
+        lookup_incomplete = False
+        if filings:
+            # Sliding window over filings, newest first: only a few are in flight,
+            # and the next is submitted only when the oldest unresolved one fails
+            # to match, so a match on a recent filing skips the older ones.
+            executor = ThreadPoolExecutor(max_workers=_FILING_WINDOW)
+            try:
+                remaining = iter(filings)
+                in_flight = deque(
+                    executor.submit(process_single_filing, filing, cik, company_name, api_key)
+                    for filing in islice(remaining, _FILING_WINDOW)
+                )
+
+                while in_flight:
+                    future = in_flight.popleft()
+                    try:
+                        firm_to_lawyers = future.result()
+                    except _LOOKUP_ERRORS as e:
+                        # No text / no lawyers in this filing - try the next one
+                        if isinstance(e, requests.RequestException) or "No text extracted" in str(e):
+                            lookup_incomplete = True
+                        logger.debug("Filing lookup failed for %s", company_name, exc_info=True)
+                        firm_to_lawyers = None
+                    except Exception:
+                        # Unexpected error in one filing - keep checking the others,
+                        # but don't cache a possibly incomplete answer
+                        lookup_incomplete = True
+                        logger.debug("Unexpected filing error for %s", company_name, exc_info=True)
+                        firm_to_lawyers = None
+
+                    if firm_to_lawyers:
+                        match = _find_firm_match(firm_to_lawyers, firm_name)
+                        if match:
+                            lawyer_name = match
+                            break
+
+                    next_filing = next(remaining, None)
+                    if next_filing is not None:
+                        in_flight.append(
+                            executor.submit(process_single_filing, next_filing, cik, company_name, api_key)
+                        )
+            finally:
+                # Don't block on filings still in flight after a match (or an error);
+                # queued ones are cancelled and running ones finish in the background
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        # Only cache complete answers; lookups hit by fetch failures are retried
+        if not lookup_incomplete:
+            _set_cached_lawyer(cache_key, lawyer_name)
+        return lawyer_name
+
+    except _LOOKUP_ERRORS:
         # Don't fail the whole search if one company fails
+        logger.debug("Lawyer lookup failed for %s", company_info.get('company_name'), exc_info=True)
         return "None found"
 
 
@@ -79,102 +208,37 @@ def search_law_firm_for_companies(firm_name, start_date, end_date, progress_call
         api_key: OpenAI API key (required if include_lawyers=True)
 
     Returns:
-        DataFrame with companies, tickers, market cap, stock loan data, and optionally lawyer names
+        DataFrame built by search_entity_for_companies: Company, Ticker, then the
+        available FMP columns (Exchange, Price, Market Cap, CEO, Enterprise Value,
+        Sector, Industry), stock loan data and Filing Date. With include_lawyers,
+        a Lawyer column follows Enterprise Value (ahead of Sector / Industry).
     """
+    add_lawyers = bool(include_lawyers and api_key)
 
-    if progress_callback:
-        progress_callback(f"Searching for companies represented by {firm_name}...")
-
-    # Get raw filing data
-    results, total = search_paginated(firm_name, start_date, end_date, max_total=10000)
-
-    if not results:
-        raise ValueError(f"No results found for law firm: {firm_name}")
-
-    df = pd.DataFrame(results)
-
-    if progress_callback:
-        progress_callback(f"Total filings found: {len(df)}")
-
-    df_filtered = filter_important_filings(df)
-
-    if progress_callback:
-        progress_callback(f"After filtering to relevant filing types: {len(df_filtered)}")
-
-    if df_filtered.empty:
-        raise ValueError(f"No relevant filings found for law firm: {firm_name}")
-
-    df_filtered[['clean_company_name', 'ticker']] = df_filtered['company_name'].apply(
-        lambda x: pd.Series(extract_ticker_and_clean_name(x))
+    # Shared EDGAR search -> tickers -> market cap -> stock loan pipeline.
+    # CIK is only carried through when the lawyer lookup needs it.
+    result_df = search_entity_for_companies(
+        firm_name, 'law firm', start_date, end_date, progress_callback,
+        include_cik=add_lawyers, report_complete=not add_lawyers
     )
 
-    df_filtered['filing_date'] = pd.to_datetime(df_filtered['filing_date'])
-
-    # Get unique companies (most recent filing)
-    df_sorted = df_filtered.sort_values('filing_date', ascending=False)
-    df_unique = df_sorted.drop_duplicates(subset=['clean_company_name'], keep='first')
-
-    if progress_callback:
-        progress_callback(f"Unique companies: {len(df_unique)}")
-
-    # Store CIK for lawyer lookup
-    df_unique['cik_stored'] = df_unique['cik']
-
-    # Create result dataframe
-    result_df = df_unique[['clean_company_name', 'ticker', 'filing_date', 'cik_stored']].copy()
-    result_df.columns = ['Company', 'Ticker', 'Filing Date', 'CIK']
-
-    result_df = result_df[result_df['Ticker'] != ""].copy()
-
-    # Clean ticker
-    result_df['Ticker_Clean'] = result_df['Ticker'].str.replace(' US Equity', '', regex=False).str.strip().str.upper()
-
-    if progress_callback:
-        progress_callback(f"Filtering to reference tickers and adding market cap...")
-
-    # Filter by reference tickers and add market cap
-    from .stock_reference import filter_and_enrich_tickers
-    result_df = filter_and_enrich_tickers(result_df, ticker_column='Ticker_Clean')
-
-    if result_df.empty:
-        raise ValueError(f"No companies found with tickers in stock reference file")
-
-    if progress_callback:
-        progress_callback(f"Adding stock loan availability data...")
-
-    # Fetch stock loan data
-    try:
-        from .stock_loan import fetch_shortstock_data
-        stock_loan_df = fetch_shortstock_data()
-        stock_loan_df['Symbol_Clean'] = stock_loan_df['Symbol'].str.strip().str.upper()
-
-        result_df = result_df.merge(
-            stock_loan_df[['Symbol_Clean', 'Rebate Rate (%)', 'Fee Rate (%)', 'Available']],
-            left_on='Ticker_Clean',
-            right_on='Symbol_Clean',
-            how='left'
-        )
-        result_df = result_df.drop('Symbol_Clean', axis=1)
-    except Exception as e:
-        if progress_callback:
-            progress_callback(f"Note: Could not fetch stock loan data ({str(e)})")
-
     # Add lawyer names if requested (SLOW - processes each company)
-    if include_lawyers and api_key:
+    if add_lawyers:
         if progress_callback:
             progress_callback(f"Finding lawyers for each company (this may take a few minutes)...")
 
-        # Prepare company info for parallel processing
-        companies_info = []
-        for _, row in result_df.iterrows():
-            companies_info.append({
-                'ticker': row['Ticker_Clean'],
-                'cik': row['CIK'],
-                'company_name': row['Company']
-            })
+        # Prepare company info for parallel processing (plain column lists, no per-row Series)
+        companies_info = [
+            {'ticker': ticker, 'cik': cik, 'company_name': company}
+            for ticker, cik, company in zip(
+                result_df['Ticker'].tolist(),
+                result_df['CIK'].tolist(),
+                result_df['Company'].tolist()
+            )
+        ]
 
         # Process companies in parallel (3 at a time to not overwhelm)
-        lawyers = []
+        lawyers = {}
         with ThreadPoolExecutor(max_workers=3) as executor:
             future_to_company = {
                 executor.submit(
@@ -184,7 +248,7 @@ def search_law_firm_for_companies(firm_name, start_date, end_date, progress_call
                     api_key,
                     start_date,
                     end_date
-                ): company_info
+                ): company_info['company_name']
                 for company_info in companies_info
             }
 
@@ -194,65 +258,32 @@ def search_law_firm_for_companies(firm_name, start_date, end_date, progress_call
                 if progress_callback and completed % 5 == 0:
                     progress_callback(f"Progress: {completed}/{len(companies_info)} companies processed...")
 
+                company = future_to_company[future]
                 try:
-                    lawyer_name = future.result()
-                    lawyers.append(lawyer_name)
+                    lawyers[company] = future.result()
                 except Exception:
-                    lawyers.append("None found")
+                    # Unexpected error - still don't fail the whole search for one company
+                    logger.debug("Lawyer extraction failed for %s", company, exc_info=True)
+                    lawyers[company] = "None found"
 
-        result_df['Lawyer'] = lawyers
+        # Futures complete out of order, so map results back by company in one assignment
+        # Few distinct lawyers repeat across many rows, so store them as a categorical
+        result_df['Lawyer'] = result_df['Company'].map(lawyers).fillna("None found").astype('category')
 
         if progress_callback:
-            found_count = sum(1 for l in lawyers if l != "None found")
+            found_count = sum(1 for l in lawyers.values() if l != "None found")
             progress_callback(f"Found lawyers for {found_count}/{len(lawyers)} companies")
 
-    result_df['Ticker'] = result_df['Ticker_Clean']
-
-    # Drop temporary columns
-    result_df = result_df.drop(['Ticker_Clean', 'CIK'], axis=1, errors='ignore')
-
-    # Format Filing Date
-    result_df['Filing Date'] = pd.to_datetime(result_df['Filing Date']).dt.strftime('%Y-%m-%d')
-
-    # Final columns: Company, Ticker, Exchange, Market Cap, CEO, IPO Date, Enterprise Value, Lawyer (if included), Stock Loan, Filing Date
-    final_columns = ['Company', 'Ticker']
-
-    # Add FMP enrichment columns in the right order
-    if 'Exchange' in result_df.columns:
-        final_columns.append('Exchange')
-
-    if 'Price' in result_df.columns:
-        final_columns.append('Price')
+        result_df = result_df.drop('CIK', axis=1)
 
-    final_columns.append('Market Cap')
+        # Place Lawyer after the company info columns, ahead of 52wk / stock loan data
+        columns = [col for col in result_df.columns if col != 'Lawyer']
+        anchor = next(col for col in ('Enterprise Value', 'CEO', 'Market Cap', 'Ticker') if col in columns)
+        columns.insert(columns.index(anchor) + 1, 'Lawyer')
+        result_df = result_df[columns]
 
-    # Add new FMP columns
-    if 'CEO' in result_df.columns:
-        final_columns.append('CEO')
-    if 'IPO Date' in result_df.columns:
-        final_columns.append('IPO Date')
-    if 'Enterprise Value' in result_df.columns:
-        final_columns.append('Enterprise Value')
-
-    # Add Lawyer column if included
-    if 'Lawyer' in result_df.columns:
-        final_columns.append('Lawyer')
-
-    if '52wk High' in result_df.columns:
-        final_columns.append('52wk High')
-    if '52wk Low' in result_df.columns:
-        final_columns.append('52wk Low')
-
-    if 'Rebate Rate (%)' in result_df.columns:
-        final_columns.extend(['Rebate Rate (%)', 'Fee Rate (%)', 'Available'])
-
-    final_columns.append('Filing Date')
-
-    # Only include columns that exist
-    final_columns = [col for col in final_columns if col in result_df.columns]
-    result_df = result_df[final_columns]
-
-    if progress_callback:
-        progress_callback(f"Search complete: {len(result_df)} companies")
+        # The shared pipeline's completion message was held back for the lawyer phase
+        if progress_callback:
+            progress_callback(f"Search complete: {len(result_df)} companies")
 
     return result_df
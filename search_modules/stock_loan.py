@@ -1,5 +1,6 @@
 from ftplib import FTP
 import pandas as pd
+import streamlit as st
 from io import BytesIO
 from .stock_reference import load_stock_reference
 
@@ -49,12 +50,26 @@ def fetch_shortstock_data():
         df['Fee Rate (%)'] = pd.to_numeric(df['Fee Rate (%)'], errors='coerce')
         df['Available'] = pd.to_numeric(df['Available'], errors='coerce')
 
+        # Clean symbols for matching once here (and cached) rather than per search
+        df['Symbol_Clean'] = df['Symbol'].str.strip().str.upper()
+
         return df
 
     except Exception as e:
         raise Exception(f"Error fetching stock loan data: {e}")
 
 
+@st.cache_data(ttl=900, show_spinner=False)
+def fetch_shortstock_data_cached():
+    """
+    fetch_shortstock_data cached for 15 minutes, for the company searches
+
+    The Stock Loan page goes through fetch_shortstock_with_market_cap, which
+    uses the uncached fetch so its explicit refresh always pulls live data.
+    """
+    return fetch_shortstock_data()
+
+
 def fetch_shortstock_with_market_cap():
     """
     NEW FLOW: Start with FMP data, filter US stocks, then join with IB short interest
@@ -71,14 +86,12 @@ def fetch_shortstock_with_market_cap():
         if us_stocks is None:
             # Fallback to old flow if FMP data not available
             stock_loan_df = fetch_shortstock_data()
-            return stock_loan_df
+            # Symbol_Clean is an internal join key, not a display column
+            return stock_loan_df.drop('Symbol_Clean', axis=1)
 
         # Step 2: Fetch IB short interest data
         stock_loan_df = fetch_shortstock_data()
 
-        # Clean IB symbols for matching
-        stock_loan_df['Symbol_Clean'] = stock_loan_df['Symbol'].str.strip().str.upper()
-
         # Step 4: Left-join so ALL FMP stocks appear; IB columns are NaN
         # for stocks not in IB's list (e.g. easy-to-borrow mega-caps like NVDA).
         enriched_df = us_stocks.merge(
@@ -16,14 +16,32 @@ HEADERS = {
 
 TARGET_COMPANIES = 100
 
+_RELEVANT_FILINGS_SET = frozenset(RELEVANT_FILINGS)
 
-def extract_ticker_and_clean_name(company_name):
-    """Extract ticker from company name"""
-    name_without_cik = re.sub(r'\s*\(CIK\s+\d+\)', '', company_name)
-    ticker_match = re.search(r'\(([A-Z0-9\-]+)', name_without_cik)
-    ticker = ticker_match.group(1) if ticker_match else ""
-    clean_name = re.split(r'\s*\(', name_without_cik)[0].strip()
-    return clean_name, ticker
+
+_CIK_SUFFIX_RE = re.compile(r'\s*\(CIK\s+\d+\)')
+_NAME_TICKER_RE = re.compile(r'^(?P<clean_company_name>[^(]*)(?:.*?\((?P<ticker>[A-Z0-9\-]+))?', re.DOTALL)
+
+
+def extract_tickers_and_clean_names(company_names):
+    """
+    Extract clean company names and tickers from a Series of EDGAR display names.
+
+    The "(CIK ...)" suffix is removed first; the name is everything before the
+    first "(", and the ticker is the first "(" followed by a ticker-like run.
+
+    Returns a DataFrame with 'clean_company_name' and 'ticker' columns aligned
+    to the input index (ticker is "" when none is found).
+    """
+    without_cik = company_names.astype(str).str.replace(_CIK_SUFFIX_RE, '', regex=True)
+    extracted = without_cik.str.extract(_NAME_TICKER_RE).fillna('')
+    extracted['clean_company_name'] = extracted['clean_company_name'].str.strip()
+    return extracted[['clean_company_name', 'ticker']]
+
+
+def clean_tickers(tickers):
+    """Remove the " US Equity" suffix, strip whitespace and upper-case tickers in one pass (returns a list)"""
+    return [t.replace(' US Equity', '').strip().upper() for t in tickers]
 
 
 def _pick_best_display_name(display_names):
@@ -145,12 +163,13 @@ def count_unique_companies(search_term, from_date, to_date):
     if not results:
         return 0
 
-    df = pd.DataFrame(results)
-    df_filtered = df[df["filing_type"].isin(RELEVANT_FILINGS)].copy()
+    relevant_results = filter_important_results(results)
+    if not relevant_results:
+        return 0
 
-    df_filtered[['clean_company_name', 'ticker']] = df_filtered['company_name'].apply(
-        lambda x: pd.Series(extract_ticker_and_clean_name(x))
-    )
+    df_filtered = pd.DataFrame(relevant_results)
+
+    df_filtered[['clean_company_name', 'ticker']] = extract_tickers_and_clean_names(df_filtered['company_name'])
 
     unique_with_tickers = df_filtered[df_filtered['ticker'] != '']['clean_company_name'].nunique()
     return unique_with_tickers
@@ -202,23 +221,49 @@ def determine_optimal_date_range(search_term, progress_callback=None):
     return start_date, end_date, final_range
 
 
-def filter_important_filings(df):
-    """Filter for comprehensive filing types"""
-    if df.empty:
-        return df
-    return df[df["filing_type"].isin(RELEVANT_FILINGS)].copy()
+def filter_important_results(results):
+    """Filter raw search_edgar results for comprehensive filing types (before building a DataFrame)"""
+    return [r for r in results if r.get("filing_type") in _RELEVANT_FILINGS_SET]
 
 
 def deduplicate_companies(df):
-    """Keep only most recent filing per company"""
+    """Keep only most recent filing per company, newest first"""
     if df.empty:
         return df
-    df = df.sort_values('filing_date', ascending=False)
-    df_unique = df.drop_duplicates(subset=['clean_company_name'], keep='first')
-    return df_unique
+    # One hash-based groupby pass to find each company's latest filing instead of
+    # sorting every filing; only the (much smaller) unique set is sorted.
+    # Missing dates rank oldest, as they did under the previous full sort.
+    filing_dates = df['filing_date'].fillna(pd.Timestamp.min)
+    latest_idx = filing_dates.groupby(df['clean_company_name'], sort=False).idxmax()
+    df_unique = df.loc[latest_idx]
+    return df_unique.sort_values('filing_date', ascending=False)
+
 
+STOCK_LOAN_COLUMNS = ['Rebate Rate (%)', 'Fee Rate (%)', 'Available']
 
-def search_entity_for_companies(entity_name, entity_type, start_date, end_date, progress_callback=None):
+
+def merge_stock_loan_data(result_df, stock_loan_df, ticker_column='Ticker_Clean'):
+    """
+    Left-join stock loan columns onto result_df by ticker.
+
+    stock_loan_df must have a cleaned 'Symbol_Clean' column. Each column is
+    looked up with Series.map against a symbol-indexed table, which is a single
+    hash lookup per row and avoids DataFrame.merge's general join machinery.
+    Tickers without stock loan data get NaN, as with a left merge.
+    """
+    stock_loan_by_symbol = (
+        stock_loan_df.dropna(subset=['Symbol_Clean'])
+        .drop_duplicates(subset=['Symbol_Clean'], keep='first')
+        .set_index('Symbol_Clean')[STOCK_LOAN_COLUMNS]
+    )
+
+    result_df = result_df.copy()
+    for col in STOCK_LOAN_COLUMNS:
+        result_df[col] = result_df[ticker_column].map(stock_loan_by_symbol[col])
+    return result_df
+
+
+def search_entity_for_companies(entity_name, entity_type, start_date, end_date, progress_callback=None, include_cik=False, report_complete=True):
     """
     Shared function to search for companies represented by a lawyer or law firm
 
@@ -228,12 +273,15 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
         start_date: Start date for search
         end_date: End date for search
         progress_callback: Optional progress callback function
+        include_cik: If True, keep a trailing "CIK" column (e.g. for per-company lawyer lookups)
+        report_complete: If False, skip the final "Search complete" progress message
+            (for callers that do more work afterwards)
 
     Returns:
         DataFrame with companies, tickers, market cap, and stock loan data
     """
     from .stock_reference import filter_and_enrich_tickers
-    from .stock_loan import fetch_shortstock_data
+    from .stock_loan import fetch_shortstock_data_cached
 
     if progress_callback:
         progress_callback(f"Searching {entity_type}: {entity_name}")
@@ -252,22 +300,21 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
     if not results:
         raise ValueError(f"No results found for {entity_type}: {entity_name}")
 
-    df = pd.DataFrame(results)
-
     if progress_callback:
-        progress_callback(f"Total filings found: {len(df)}")
+        progress_callback(f"Total filings found: {len(results)}")
 
-    df_filtered = filter_important_filings(df)
+    # Filter the raw dicts first so the DataFrame is only built for relevant filings
+    relevant_results = filter_important_results(results)
 
     if progress_callback:
-        progress_callback(f"After filtering to relevant filing types: {len(df_filtered)}")
+        progress_callback(f"After filtering to relevant filing types: {len(relevant_results)}")
 
-    if df_filtered.empty:
+    if not relevant_results:
         raise ValueError(f"No relevant filings found for {entity_type}: {entity_name}")
 
-    df_filtered[['clean_company_name', 'ticker']] = df_filtered['company_name'].apply(
-        lambda x: pd.Series(extract_ticker_and_clean_name(x))
-    )
+    df_filtered = pd.DataFrame(relevant_results)
+
+    df_filtered[['clean_company_name', 'ticker']] = extract_tickers_and_clean_names(df_filtered['company_name'])
 
     # --- Fallback: name-prefix match for companies with no ticker in display_names ---
     # EDGAR doesn't always embed a ticker in the display name (e.g. equity-plan
@@ -301,7 +348,8 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
             if progress_callback and recovered:
                 progress_callback(f"Recovered {recovered} companies via name-prefix lookup")
 
-    df_filtered['filing_date'] = pd.to_datetime(df_filtered['filing_date'])
+    # EDGAR file_date is always ISO; an explicit format skips per-value inference
+    df_filtered['filing_date'] = pd.to_datetime(df_filtered['filing_date'], format='%Y-%m-%d')
 
     df_unique = deduplicate_companies(df_filtered)
 
@@ -315,15 +363,20 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
     if progress_callback:
         progress_callback(f"Unique companies: {len(df_unique)}")
 
-    df_unique = df_unique.sort_values('filing_date', ascending=False)
-
-    result_df = df_unique[['clean_company_name', 'ticker', 'filing_date']].copy()
-    result_df.columns = ['Company', 'Ticker', 'Filing Date']
-
-    result_df = result_df[result_df['Ticker'] != ""].copy()
-
-    # Clean ticker (remove " US Equity" suffix if present for filtering)
-    result_df['Ticker_Clean'] = result_df['Ticker'].str.replace(' US Equity', '', regex=False).str.strip().str.upper()
+    # Build the result frame once from the filtered column arrays (rows without a
+    # ticker dropped), instead of projecting, renaming and adding columns in steps.
+    has_ticker = (df_unique['ticker'] != "").to_numpy()
+    tickers = df_unique['ticker'].to_numpy()[has_ticker]
+    result_columns = {
+        'Company': df_unique['clean_company_name'].to_numpy()[has_ticker],
+        'Ticker': tickers,
+        'Filing Date': df_unique['filing_date'].to_numpy()[has_ticker],
+        # Clean ticker (remove " US Equity" suffix if present for filtering)
+        'Ticker_Clean': clean_tickers(tickers),
+    }
+    if include_cik:
+        result_columns['CIK'] = df_unique['cik'].to_numpy()[has_ticker]
+    result_df = pd.DataFrame(result_columns, copy=False)
 
     if progress_callback:
         progress_callback(f"Filtering to reference tickers and adding market cap...")
@@ -339,19 +392,10 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
 
     # Fetch stock loan data
     try:
-        stock_loan_df = fetch_shortstock_data()
-        # Clean symbols for matching
-        stock_loan_df['Symbol_Clean'] = stock_loan_df['Symbol'].str.strip().str.upper()
+        stock_loan_df = fetch_shortstock_data_cached()
 
         # Merge stock loan data
-        result_df = result_df.merge(
-            stock_loan_df[['Symbol_Clean', 'Rebate Rate (%)', 'Fee Rate (%)', 'Available']],
-            left_on='Ticker_Clean',
-            right_on='Symbol_Clean',
-            how='left'
-        )
-        # Drop extra column
-        result_df = result_df.drop('Symbol_Clean', axis=1)
+        result_df = merge_stock_loan_data(result_df, stock_loan_df, ticker_column='Ticker_Clean')
 
     except Exception as e:
         if progress_callback:
@@ -363,8 +407,8 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
     # Drop temporary column
     result_df = result_df.drop('Ticker_Clean', axis=1)
 
-    # Format Filing Date
-    result_df['Filing Date'] = pd.to_datetime(result_df['Filing Date']).dt.strftime('%Y-%m-%d')
+    # Format Filing Date (already datetime64 from the parse above)
+    result_df['Filing Date'] = result_df['Filing Date'].dt.strftime('%Y-%m-%d')
 
     # Reorder columns: Company, Ticker, Exchange, Price, Market Cap, CEO, Enterprise Value, Sector, Industry, Stock Loan, Filing Date
     final_columns = ['Company', 'Ticker']
@@ -401,11 +445,14 @@ def search_entity_for_companies(entity_name, entity_type, start_date, end_date,
 
     final_columns.append('Filing Date')
 
+    if include_cik:
+        final_columns.append('CIK')
+
     # Only include columns that exist
     final_columns = [col for col in final_columns if col in result_df.columns]
     result_df = result_df[final_columns]
 
-    if progress_callback:
+    if progress_callback and report_complete:
         progress_callback(f"Search complete: {len(result_df)} companies")
 
     return result_df